@@ -4,24 +4,233 @@ RSS Scraper
 Sidharrth Nagappan (c) 2025
 """
 
+import argparse
+from array import array
+import asyncio
 from collections import defaultdict
+import importlib.util
+import io
+from itertools import islice
 import json
+import os
 import re
+import aiohttp
 import requests
 import feedparser
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from lxml import etree
+import numpy as np
 import pypdf
-from tqdm import tqdm
+import shutil
+from types import MappingProxyType
+from tqdm.asyncio import tqdm
 
 import logging
 
-from utils import clean_title
+from utils import clean_titles
 from bertopic import BERTopic
-from sklearn.feature_extraction.text import CountVectorizer
+from sentence_transformers import SentenceTransformer
+from sklearn.cluster import KMeans
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+import torch
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 logging.basicConfig(level=logging.WARNING)
 
+# Matches both http and https URLs in the text extracted from the PDF
+_URL_RE = re.compile(r"https?://[^\s]+")
+
+
+def _write_json(data, filename: str) -> None:
+    """
+    Write data to a JSON file, using orjson's C encoder when it is installed and the standard library otherwise.
+    Both produce the same 2-space indented UTF-8 output.
+    """
+    if orjson is not None:
+        with open(filename, "wb") as f:
+            f.write(
+                orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            )
+    else:
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+# Entry title tags of RSS 2.0, Atom and RSS 1.0 (RDF). Namespaced extensions such as itunes:title or media:title
+# also sit under <item> but are not the headline
+_TITLE_TAGS = (
+    "title",
+    "{http://www.w3.org/2005/Atom}title",
+    "{http://purl.org/rss/1.0/}title",
+)
+
+# Same sentence-transformer BERTopic uses by default for English
+_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+# Titles are cut to this many characters (roughly 32 tokens) before embedding, and the tokenizer to this many tokens,
+# since attention cost grows with sequence length and a headline's gist is in its first words
+_MAX_TITLE_CHARS = 128
+_MAX_SEQ_LENGTH = 64
+
+
+def _select_device() -> str:
+    """
+    Pick the fastest torch device available for running the embedding model.
+    """
+    if torch.cuda.is_available():
+        return "cuda"
+    if torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
+
+
+def _embed_titles(embedding_model: SentenceTransformer, titles: list) -> np.ndarray:
+    """
+    Embed the titles, sharding them across a pool of worker processes, one per GPU, when there are several GPUs.
+    Otherwise they are embedded in-process on a single device; on CPU a single encode already uses every core.
+
+    Args:
+        embedding_model (SentenceTransformer): Model to embed the titles with.
+        titles (list): Titles to embed.
+
+    Returns:
+        np.ndarray: Normalized float32 embeddings, one row per title.
+    """
+    titles = [title[:_MAX_TITLE_CHARS] for title in titles]
+
+    if torch.cuda.device_count() < 2:
+        embeddings = embedding_model.encode(
+            titles,
+            batch_size=64,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
+    else:
+        target_devices = [f"cuda:{i}" for i in range(torch.cuda.device_count())]
+        pool = embedding_model.start_multi_process_pool(target_devices=target_devices)
+        try:
+            embeddings = embedding_model.encode_multi_process(
+                titles, pool, batch_size=64, normalize_embeddings=True
+            )
+        finally:
+            embedding_model.stop_multi_process_pool(pool)
+
+    # Left in float32 on purpose: umap-learn upcasts narrower input back to float32, so casting to float16 here would
+    # only hold a second copy of the corpus at peak
+    return embeddings
+
+
+def _cluster_models() -> tuple:
+    """
+    Use cuML's GPU implementations of UMAP and HDBSCAN when RAPIDS is installed.
+
+    Returns:
+        tuple: (umap_model, hdbscan_model), both None when cuML is unavailable so BERTopic uses its CPU defaults.
+    """
+    if importlib.util.find_spec("cuml") is None:
+        return None, None
+
+    from cuml.cluster import HDBSCAN
+    from cuml.manifold import UMAP
+
+    # Embeddings are normalized, so UMAP's default euclidean metric ranks neighbours the same as cosine
+    umap_model = UMAP(n_components=5, n_neighbors=15, min_dist=0.0)
+    hdbscan_model = HDBSCAN(
+        min_samples=10, min_cluster_size=10, gen_min_span_tree=True, prediction_data=True
+    )
+    return umap_model, hdbscan_model
+
+
+def _is_feed_response(response: aiohttp.ClientResponse) -> bool:
+    """
+    Check whether a response is successful and advertises XML/RSS content.
+    """
+    content_type = response.headers.get("Content-Type", "")
+    return response.status == 200 and ("xml" in content_type or "rss" in content_type)
+
+
+async def _read_feed_titles(response: aiohttp.ClientResponse, num_titles: int) -> list:
+    """
+    Stream the feed body through lxml and stop reading as soon as enough entry titles have been collected,
+    instead of downloading and parsing the whole feed.
+
+    Falls back to feedparser when the feed is malformed or lxml finds no entry titles, since feedparser is far more
+    forgiving of broken markup.
+
+    Args:
+        response (aiohttp.ClientResponse): Response whose body has not been read yet.
+        num_titles (int): Number of titles to extract.
+
+    Returns:
+        list: Raw titles of the first entries in the feed, cleaned later in one batch.
+    """
+    try:
+        parser = etree.XMLPullParser(
+            events=("end",),
+            tag=_TITLE_TAGS,
+            encoding=response.charset,
+            resolve_entities=False,
+            no_network=True,
+        )
+    except LookupError:
+        # Charset in the Content-Type header that libxml2 doesn't know, let the document declare its own
+        parser = etree.XMLPullParser(
+            events=("end",), tag=_TITLE_TAGS, resolve_entities=False, no_network=True
+        )
+    titles = []
+    chunks = []
+
+    def collect_titles():
+        for _, element in parser.read_events():
+            parent = element.getparent()
+            # Only entry titles count, not the title of the channel or its image
+            if parent is not None and etree.QName(parent).localname in ("item", "entry"):
+                title = "".join(element.itertext()).strip()
+                if title:
+                    titles.append(title)
+            element.clear()
+
+    try:
+        async for chunk in response.content.iter_chunked(1 << 16):
+            chunks.append(chunk)
+            parser.feed(chunk)
+            collect_titles()
+            if len(titles) >= num_titles:
+                return titles[:num_titles]
+        parser.close()
+        collect_titles()
+    except etree.XMLSyntaxError as e:
+        # Titles read before the error may already be mangled, so leave the whole feed to feedparser
+        logging.debug("lxml could not parse %s: %s", response.url, e)
+        titles = []
+
+    if titles:
+        return titles
+
+    # Hand whatever was already streamed plus the rest of the body to feedparser.
+    # Passing it as a stream stops feedparser from first trying to open it as a file path,
+    # and the declared charset saves it from sniffing the encoding itself
+    chunks.append(await response.content.read())
+    feed = feedparser.parse(
+        io.BytesIO(b"".join(chunks)),
+        response_headers={"content-type": response.headers.get("Content-Type", "")},
+    )
+    # .get skips FeedParserDict's attribute lookup, and tolerates entries with no title at all
+    titles = []
+    for entry in islice(feed.entries, num_titles * 2):
+        title = entry.get("title")
+        if not title:
+            continue
+        titles.append(title)
+        if len(titles) >= num_titles:
+            break
+    return titles
+
 
 class RSSScraper:
     """
@@ -32,83 +241,184 @@ class RSSScraper:
 
     def __init__(self, pdf_url):
         self.pdf_url = pdf_url
-        self.rss_content = defaultdict(list)
         self.urls = []
+        self._pdf_path = "rss_urls.pdf"
+
+        # Titles are kept as parallel arrays rather than a dict of url -> titles, so topic modelling can use the flat
+        # list directly while _url_ids (indices into _feed_urls) keeps track of which feed each title came from
+        self._feed_urls = []
+        self._titles = []
+        self._url_ids = array("i")
+
+        # url -> {"etag", "last_modified", "titles"} from earlier runs, used to make conditional requests
+        self._http_cache = {}
+
+    @property
+    def rss_content(self) -> MappingProxyType:
+        """
+        Extracted titles grouped by feed URL, built on demand from the parallel title arrays.
+
+        The mapping is read-only so that assigning into it fails loudly instead of silently writing to a copy,
+        use add_feed to record titles.
+        """
+        content = {url: [] for url in self._feed_urls}
+        for url_id, title in zip(self._url_ids, self._titles):
+            content[self._feed_urls[url_id]].append(title)
+        return MappingProxyType(content)
+
+    def add_feed(self, url: str, titles: list) -> None:
+        """
+        Record the titles extracted from a feed.
+
+        Args:
+            url (str): The feed URL.
+            titles (list): Titles extracted from the feed.
+        """
+        url_id = len(self._feed_urls)
+        self._feed_urls.append(url)
+        self._titles.extend(titles)
+        self._url_ids.extend([url_id] * len(titles))
 
     def download_pdf(self, download_path: str) -> None:
         """
         STEP 1:
         Download the PDF file from the RSS URL and save it locally for analysis.
         """
-        response = requests.get(self.pdf_url, timeout=10)
-        response.raise_for_status()
-        with open(download_path, "wb") as f:
-            f.write(response.content)
+        # Stream the PDF to disk in chunks rather than holding the whole file in memory
+        with requests.get(self.pdf_url, timeout=10, stream=True) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            with open(download_path, "wb") as f:
+                shutil.copyfileobj(response.raw, f, length=1 << 16)
+        self._pdf_path = download_path
 
     def extract_urls(self) -> None:
         """
         STEP 2:
         Extract URLs from the downloaded PDF file.
         """
-        with open("rss_urls.pdf", "rb") as f:
+        # dict keys dedupe the URLs while keeping the order they appear in the PDF
+        seen = {}
+        with open(self._pdf_path, "rb") as f:
             reader = pypdf.PdfReader(f)
-            text = "".join(page.extract_text() for page in reader.pages)
-
-        # Use regex to find all URLs in the text, including http and https
-        urls = re.findall(r"(https?://[^\s]+)", text)
-        self.urls.extend(list(set(urls)))
-
-    def verify_and_extract_titles(self, url: str, num_titles: int = 5) -> tuple:
+            for page in reader.pages:
+                for url in _URL_RE.findall(page.extract_text() or ""):
+                    seen[url] = None
+        self.urls.extend(seen)
+
+    async def verify_and_extract_titles(
+        self, session: aiohttp.ClientSession, url: str, num_titles: int = 5
+    ) -> tuple:
         """
         Verify if a URL is a valid RSS feed and extract titles if valid.
+        Titles are returned raw, extract_data cleans them all in one batch.
+
+        Feeds seen on an earlier run are requested conditionally with their ETag/Last-Modified, and their cached
+        titles are reused when the server answers 304 Not Modified.
 
         Args:
+            session (aiohttp.ClientSession): Shared HTTP session used to fetch the feed.
             url (str): The URL to verify.
             num_titles (int, optional): Number of titles to extract. Defaults to 5.
         """
+        cached = self._http_cache.pop(url, None)
+        headers = {}
         try:
-            response = requests.get(url, timeout=5)
-            if response.status_code == 200:
-                content_type = response.headers.get("Content-Type", "")
-                if "xml" in content_type or "rss" in content_type:
-                    feed = feedparser.parse(response.content)
-                    titles = [
-                        clean_title(entry.title)
-                        for entry in feed.entries[:num_titles]
-                        if entry.title
-                    ]
+            if cached is None:
+                # Probe with HEAD first so HTML pages are rejected without downloading their body
+                async with session.head(
+                    url, timeout=aiohttp.ClientTimeout(total=3), allow_redirects=True
+                ) as response:
+                    # Servers that don't implement HEAD fall through to the GET below
+                    if response.status != 405 and not _is_feed_response(response):
+                        return url, []
+            else:
+                # Already known to be a feed, so skip the probe and only ask for it if it changed
+                if cached["etag"]:
+                    headers["If-None-Match"] = cached["etag"]
+                if cached["last_modified"]:
+                    headers["If-Modified-Since"] = cached["last_modified"]
+
+            async with session.get(
+                url, headers=headers, timeout=aiohttp.ClientTimeout(total=5)
+            ) as response:
+                if response.status == 304 and cached is not None:
+                    logging.debug("Feed not modified since last run: %s", url)
+                    self._http_cache[url] = cached
+                    return url, cached["titles"]
+                if _is_feed_response(response):
+                    titles = await _read_feed_titles(response, num_titles)
                     logging.debug("Extracted titles from %s: %s", url, titles)
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+                    if titles and (etag or last_modified):
+                        self._http_cache[url] = {
+                            "etag": etag,
+                            "last_modified": last_modified,
+                            "titles": titles,
+                        }
                     return url, titles
             return url, []
-        except requests.exceptions.RequestException as e:
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             logging.debug("Error processing %s: %s", url, e)
+            # A network error says nothing about the feed itself, so keep it cached for the next run
+            if cached is not None:
+                self._http_cache[url] = cached
             return url, []
 
-    def extract_data(self, num_threads: int = 10) -> None:
+    async def _extract_data(self, max_connections: int) -> int:
         """
-        Check the authenticity of URLs and extract data using parallel processing.
+        Fetch every URL on a single event loop, sharing one connection pool across all requests.
 
-        Args:
-            num_threads (int, optional): Number of threads for parallel processing. Defaults to 10.
+        Returns:
+            int: Number of URLs that turned out to be valid RSS feeds.
         """
+        semaphore = asyncio.Semaphore(max_connections)
+
+        async def bounded_verify(session, url):
+            async with semaphore:
+                return await self.verify_and_extract_titles(session, url)
+
         num_valid_urls = 0
-        with ThreadPoolExecutor(max_workers=num_threads) as executor:
-            future_to_url = {
-                executor.submit(self.verify_and_extract_titles, url): url
-                for url in self.urls
-            }
-            for future in tqdm(
-                as_completed(future_to_url),
-                total=len(future_to_url),
+        connector = aiohttp.TCPConnector(limit=max_connections, ttl_dns_cache=300)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            for future in tqdm.as_completed(
+                [bounded_verify(session, url) for url in self.urls],
+                total=len(self.urls),
                 desc="Processing URLs",
             ):
-                url, titles = future.result()
+                url, titles = await future
                 if titles:
                     logging.info("Valid RSS Feed: %s", url)
-                    self.rss_content[url] = titles
+                    self.add_feed(url, titles)
                     num_valid_urls += 1
                 else:
                     logging.debug("Invalid RSS Feed: %s", url)
+        return num_valid_urls
+
+    def extract_data(self, max_connections: int = 100, cache_file: str = None) -> None:
+        """
+        Check the authenticity of URLs and extract data, multiplexing all requests on one asyncio event loop.
+
+        Args:
+            max_connections (int, optional): Maximum number of requests in flight at once. Defaults to 100.
+            cache_file (str, optional): JSON file keeping each feed's ETag/Last-Modified and titles between runs,
+                so unchanged feeds cost a 304 instead of a full download. Defaults to None (no caching).
+        """
+        if cache_file and os.path.exists(cache_file):
+            with open(cache_file, encoding="utf-8") as f:
+                self._http_cache = json.load(f)
+
+        num_valid_urls = asyncio.run(self._extract_data(max_connections))
+
+        if cache_file:
+            _write_json(self._http_cache, cache_file)
+
+        # Clean all titles in one batch so headlines shared between feeds are only cleaned once,
+        # then drop titles a feed repeats (only apparent once cleaned), keeping their order
+        unique = dict.fromkeys(zip(self._url_ids, clean_titles(self._titles)))
+        self._url_ids = array("i", (url_id for url_id, _ in unique))
+        self._titles = [title for _, title in unique]
 
         # print out the statistics
         logging.info("Total valid URLs: %d", num_valid_urls)
@@ -126,74 +436,214 @@ class RSSScraper:
 
         More complex checks such as comparing the similarity of titles can be added here later.
         """
-        # Check for empty titles
-        for url, titles in self.rss_content.items():
-            # No titles at all
-            if not titles:
-                logging.warning("Empty titles found for URL: %s", url)
-                continue
+        url_ids = np.frombuffer(self._url_ids, dtype=np.int32)
 
-            # Check for titles that are too short or too long
-            for title in titles:
-                if len(title) < 10:
+        # Check for titles that are too short or too long, across every feed at once and
+        # only visiting the offending titles in Python
+        lengths = np.fromiter(
+            map(len, self._titles), dtype=np.int32, count=len(self._titles)
+        )
+        for i in np.flatnonzero(lengths < 10):
+            logging.warning(
+                "Title length issue for URL: %s, Title: %s",
+                self._feed_urls[url_ids[i]],
+                self._titles[i],
+            )
+
+        # Feeds with no titles at all or very little titles picked up
+        titles_per_feed = np.bincount(url_ids, minlength=len(self._feed_urls))
+        sparse_feeds = np.flatnonzero(titles_per_feed < 3)
+        if sparse_feeds.size:
+            rss_content = self.rss_content
+            for url_id in sparse_feeds:
+                url = self._feed_urls[url_id]
+                if titles_per_feed[url_id] == 0:
+                    logging.warning("Empty titles found for URL: %s", url)
+                else:
                     logging.warning(
-                        "Title length issue for URL: %s, Title: %s", url, title
+                        "Less than 3 titles found for URL: %s, Titles: %s",
+                        url,
+                        rss_content[url],
                     )
+        logging.info("Data sanity checks completed.")
+
+    def _keyword_topics(self, titles: list, num_topics: int) -> dict:
+        """
+        Cluster a small corpus with KMeans over TF-IDF vectors, skipping the sentence-transformer and UMAP/HDBSCAN
+        entirely. The keywords of each topic are the highest weighted terms of its cluster centre.
+
+        Args:
+            titles (list): Unique titles to cluster.
+            num_topics (int): Number of clusters to form.
+
+        Returns:
+            dict: Keywords and titles of each topic, in the same shape as the BERTopic output.
+        """
+        # Terms shared by at least two titles make the better features, but a small corpus may have none at all
+        try:
+            vectorizer = TfidfVectorizer(stop_words="english", min_df=2)
+            tfidf = vectorizer.fit_transform(titles)
+        except ValueError:
+            vectorizer = TfidfVectorizer(stop_words="english", min_df=1)
+            tfidf = vectorizer.fit_transform(titles)
+        kmeans = KMeans(
+            n_clusters=min(num_topics, len(titles)), n_init="auto", random_state=42
+        ).fit(tfidf)
+        terms = vectorizer.get_feature_names_out()
+
+        clusters = defaultdict(list)
+        for title, label in zip(titles, kmeans.labels_):
+            clusters[label].append(title)
+
+        # Number the topics by size, largest first, the same way BERTopic does
+        topics_with_titles = {}
+        for topic, (label, topic_titles) in enumerate(
+            sorted(clusters.items(), key=lambda item: len(item[1]), reverse=True)
+        ):
+            # Only terms that actually occur in the cluster, titles with no known terms leave an all-zero centre
+            centre = kmeans.cluster_centers_[label]
+            top_terms = [i for i in np.argsort(centre)[::-1][:10] if centre[i] > 0]
+            topics_with_titles[f"Topic {topic}"] = {
+                "keywords": terms[top_terms].tolist(),
+                "titles": topic_titles,
+            }
+        return topics_with_titles
+
+    def _bertopic_topics(
+        self, titles: list, num_topics: int, model_dir: str = None, refit: bool = False
+    ) -> tuple:
+        """
+        Cluster the titles with BERTopic on top of sentence-transformer embeddings.
+
+        When a model saved by a previous run exists in model_dir, the titles are assigned to its topics with
+        .transform, which for a safetensors model is a cosine similarity against the topic embeddings,
+        instead of refitting UMAP/HDBSCAN from scratch.
 
-            # Very little titles picked up from that RSS feed
-            if len(titles) < 3:
-                logging.warning(
-                    "Less than 3 titles found for URL: %s, Titles: %s", url, titles
+        Args:
+            titles (list): Unique titles to cluster.
+            num_topics (int): Number of topics to reduce to.
+            model_dir (str, optional): Directory to load the fitted model from and save it to. Defaults to None (no caching).
+            refit (bool, optional): Fit a new model even if one was saved before. Defaults to False.
+
+        Returns:
+            tuple: (topics_with_titles, fitted BERTopic model)
+        """
+        # Embed the titles up front on the GPU when there is one, rather than letting BERTopic embed them on the CPU
+        embedding_model = SentenceTransformer(_EMBEDDING_MODEL, device=_select_device())
+        embedding_model.max_seq_length = _MAX_SEQ_LENGTH
+        embeddings = _embed_titles(embedding_model, titles)
+
+        if model_dir and os.path.isdir(model_dir) and not refit:
+            topic_model = BERTopic.load(model_dir, embedding_model=embedding_model)
+            topics, probabilities = topic_model.transform(titles, embeddings)
+            logging.info("Assigned titles to topics of saved model %s", model_dir)
+        else:
+            # use the count vectorizer to remove the stopwords
+            vectorizer_model = CountVectorizer(stop_words="english")
+            umap_model, hdbscan_model = _cluster_models()
+            topic_model = BERTopic(
+                embedding_model=embedding_model,
+                umap_model=umap_model,
+                hdbscan_model=hdbscan_model,
+                verbose=True,
+                nr_topics=num_topics,
+                vectorizer_model=vectorizer_model,
+            )
+
+            topics, probabilities = topic_model.fit_transform(titles, embeddings)
+
+            if model_dir:
+                # safetensors drops UMAP/HDBSCAN, so later runs only need the topic embeddings to assign titles.
+                # No embedding model pointer is saved, otherwise BERTopic.load would load the model a second time
+                # before swapping in the one passed to it
+                topic_model.save(
+                    model_dir,
+                    serialization="safetensors",
+                    save_ctfidf=True,
+                    save_embedding_model=False,
                 )
-                continue
-        logging.info("Data sanity checks completed.")
+                logging.info("Topic model saved to %s", model_dir)
+
+        # Group the titles by topic in a single pass
+        grouped = defaultdict(list)
+        for topic, title in zip(topics, titles):
+            if topic != -1:  # Exclude outliers
+                grouped[topic].append(title)
+
+        # Keep BERTopic's ordering of topics, by size
+        topics_with_titles = {}
+        for topic in topic_model.get_topic_info()["Topic"]:
+            if topic in grouped:
+                topic_keywords = topic_model.get_topic(topic)
+                topics_with_titles[f"Topic {topic}"] = {
+                    "keywords": [kw[0] for kw in topic_keywords],
+                    "titles": grouped[topic],
+                }
+        return topics_with_titles, topic_model
 
     def topic_modelling(
         self,
         num_topics: int = 5,
         topic_analysis_file_name: str = "topic_analysis.json",
         topic_bar_chart_file_name: str = "topic_visualization.html",
+        min_titles_for_bertopic: int = 500,
+        topic_model_dir: str = None,
+        refit: bool = False,
+        visualize: bool = False,
     ) -> None:
         """
         Run topic modelling on the extracted titles to get the key events of the day, using BERTopic.
 
         Note: There are more powerful ways to do this, but plain BERT is a good place to start.
-        """
-        titles = [title for titles in self.rss_content.values() for title in titles]
-        titles = list(set(titles))
-
-        # use the count vectorizer to remove the stopwords
-        vectorizer_model = CountVectorizer(stop_words="english")
-        topic_model = BERTopic(
-            verbose=True, nr_topics=num_topics, vectorizer_model=vectorizer_model
-        )
-
-        topics, probabilities = topic_model.fit_transform(titles)
 
-        topic_info = topic_model.get_topic_info()
+        Small corpora are clustered with KMeans over TF-IDF vectors instead, where loading the sentence-transformer and
+        running UMAP/HDBSCAN would cost far more than the clustering itself. The bar chart is only produced by BERTopic.
 
-        topics_with_titles = {}
-        for topic in topic_info["Topic"].unique():
-            if topic != -1:  # Exclude outliers
-                topic_titles = [titles[i] for i, t in enumerate(topics) if t == topic]
-                topic_keywords = topic_model.get_topic(topic)
-                topics_with_titles[f"Topic {topic}"] = {
-                    "keywords": [kw[0] for kw in topic_keywords],
-                    "titles": topic_titles,
-                }
+        Args:
+            min_titles_for_bertopic (int, optional): Smallest number of unique titles to run BERTopic on. Defaults to 500.
+            topic_model_dir (str, optional): Directory the fitted BERTopic model is cached in between runs. Defaults to None (no caching).
+            refit (bool, optional): Refit BERTopic even if a cached model exists. Defaults to False.
+            visualize (bool, optional): Save a bar chart of the topics to topic_bar_chart_file_name. Defaults to False.
+        """
+        # dict keys dedupe titles shared between feeds while keeping a stable order, so runs are reproducible
+        titles = list(dict.fromkeys(title for title in self._titles if title))
+
+        if len(titles) < min_titles_for_bertopic:
+            topics_with_titles = self._keyword_topics(titles, num_topics)
+            topic_model = None
+        else:
+            topics_with_titles, topic_model = self._bertopic_topics(
+                titles, num_topics, model_dir=topic_model_dir, refit=refit
+            )
+
+        # Titles were deduplicated across feeds above, so map each one back to every feed it came from
+        title_topics = {
+            title: topic
+            for topic, topic_info in topics_with_titles.items()
+            for title in topic_info["titles"]
+        }
+        topic_feeds = defaultdict(dict)
+        for url_id, title in zip(self._url_ids, self._titles):
+            topic = title_topics.get(title)
+            if topic is not None:
+                topic_feeds[topic][self._feed_urls[url_id]] = None
+        for topic, topic_info in topics_with_titles.items():
+            topic_info["feeds"] = list(topic_feeds[topic])
 
         # Save the topic information to a JSON file
-        with open(topic_analysis_file_name, "w", encoding="utf-8") as f:
-            json.dump(topics_with_titles, f, ensure_ascii=False, indent=4)
+        _write_json(topics_with_titles, topic_analysis_file_name)
         logging.info("Topic modelling results saved to %s", topic_analysis_file_name)
 
         # Print out the statistics
         logging.info("Total unique titles: %d", len(titles))
         logging.info("Total topics found: %d", len(topics_with_titles))
 
-        # save the visualization to a file
-        topic_model.visualize_barchart().write_html(topic_bar_chart_file_name)
-        logging.info("Topic visualization saved to topic_visualization.html")
+        # save the visualization to a file, loading Plotly.js from its CDN instead of embedding the ~3MB library
+        if visualize and topic_model is not None:
+            topic_model.visualize_barchart().write_html(
+                topic_bar_chart_file_name, include_plotlyjs="cdn"
+            )
+            logging.info("Topic visualization saved to %s", topic_bar_chart_file_name)
 
     def save_to_file(self, filename: str = "rss_data.json") -> None:
         """
@@ -202,12 +652,20 @@ class RSSScraper:
         Args:
             filename (str, optional): JSON filename to save extracted titles to. Defaults to "rss_data.json".
         """
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(self.rss_content, f, ensure_ascii=False, indent=4)
+        _write_json(dict(self.rss_content), filename)
         logging.info("Data saved to %s", filename)
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Scrape RSS feeds listed in a PDF and model their topics."
+    )
+    parser.add_argument(
+        "--refit",
+        action="store_true",
+        help="Refit the topic model instead of reusing the one saved by a previous run.",
+    )
+    args = parser.parse_args()
 
     scraper = RSSScraper(
         pdf_url="https://about.fb.com/wp-content/uploads/2016/05/rss-urls-1.pdf"
@@ -217,7 +675,9 @@ if __name__ == "__main__":
     # Step 2: Extract URLs from the PDF
     scraper.extract_urls()
     # Step 3: Verify and extract titles from the URLs
-    scraper.extract_data(num_threads=10)
+    scraper.extract_data(
+        max_connections=100, cache_file="./artifacts/http_cache.json"
+    )
     # Step 4: Save the extracted data to a JSON file
     scraper.save_to_file(filename="./artifacts/rss_data.json")
     # Step 5: Run sanity checks on the data
@@ -227,4 +687,7 @@ if __name__ == "__main__":
         num_topics=10,
         topic_analysis_file_name="./artifacts/topic_analysis.json",
         topic_bar_chart_file_name="./artifacts/topic_visualization.html",
+        topic_model_dir="./artifacts/topic_model",
+        refit=args.refit,
+        visualize=True,
     )
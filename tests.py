@@ -7,16 +7,79 @@ Core functionality is tested:
 3. Extracting titles from an RSS feed
 """
 
+import asyncio
+import io
+import json
+import numpy as np
 import pytest
 from unittest.mock import Mock, patch, MagicMock
+import app
+from bertopic.backend import BaseEmbedder
 from app import RSSScraper
 import os
 
-from utils import clean_title
+from utils import clean_title, clean_titles
 
 PDF_URL = "https://about.fb.com/wp-content/uploads/2016/05/rss-urls-1.pdf"
 
 
+class MockStream:
+    """
+    Minimal stand-in for aiohttp's StreamReader that hands the body out in small chunks
+    """
+
+    def __init__(self, body: bytes, chunk_size: int = 32):
+        self.chunks = [
+            body[i : i + chunk_size] for i in range(0, len(body), chunk_size)
+        ]
+
+    async def iter_chunked(self, n):
+        while self.chunks:
+            yield self.chunks.pop(0)
+
+    async def read(self):
+        rest = b"".join(self.chunks)
+        self.chunks = []
+        return rest
+
+
+class StubEmbedder(BaseEmbedder):
+    """
+    Offline stand-in for the sentence-transformer, embedding each title by the topic word it contains
+    """
+
+    TOPIC_WORDS = ["tariffs", "golf", "election"]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self.max_seq_length = 256
+
+    def encode(self, titles, **kwargs):
+        rng = np.random.default_rng(0)
+        embeddings = rng.normal(scale=0.01, size=(len(titles), 384))
+        for row, title in enumerate(titles):
+            for column, word in enumerate(self.TOPIC_WORDS):
+                if word in title.lower():
+                    embeddings[row, column] += 1.0
+        return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+    def embed(self, documents, verbose=False):
+        return self.encode(documents)
+
+
+def mock_feed_response(body: bytes, status: int = 200, content_type: str = "application/rss+xml"):
+    """
+    Build a mocked aiohttp response serving the given body
+    """
+    response = Mock()
+    response.status = status
+    response.headers = {"Content-Type": content_type}
+    response.charset = None
+    response.url = "https://example.com/rss"
+    response.content = MockStream(body)
+    return response
+
+
 @pytest.fixture
 def mock_scraper():
     """
@@ -30,18 +93,20 @@ def test_download_pdf(mock_get, mock_scraper, tmp_path):
     """
     Test the download PDF method
     """
-    mock_response = Mock()
-    mock_response.content = b"PDF content"
-    mock_get.return_value = mock_response
+    mock_response = MagicMock()
+    mock_response.raw = io.BytesIO(b"PDF content")
+    mock_get.return_value.__enter__.return_value = mock_response
 
     download_path = tmp_path / "rss_urls.pdf"
 
     mock_scraper.download_pdf(download_path)
 
     mock_get.assert_called_once_with(
-        "https://about.fb.com/wp-content/uploads/2016/05/rss-urls-1.pdf", timeout=10
+        "https://about.fb.com/wp-content/uploads/2016/05/rss-urls-1.pdf",
+        timeout=10,
+        stream=True,
     )
-    assert download_path.exists()
+    assert download_path.read_bytes() == b"PDF content"
 
 
 @patch("pypdf.PdfReader")
@@ -67,14 +132,13 @@ def test_extract_urls(mock_pdf_reader, mock_scraper, tmp_path):
     os.chdir(tmp_path)  # Ensure working directory is tmp_path
     mock_scraper.extract_urls()
 
-    expected_urls = {"https://example.com/rss1", "https://example.com/rss2"}
-    assert set(mock_scraper.urls) == expected_urls
-    assert len(mock_scraper.urls) == 2
+    # duplicates are dropped while keeping the order the URLs appear in the PDF
+    expected_urls = ["https://example.com/rss1", "https://example.com/rss2"]
+    assert mock_scraper.urls == expected_urls
 
     mock_pdf_reader.assert_called_once()
 
 
-@patch("requests.get")
 @pytest.mark.parametrize(
     "rss_content,expected_titles",
     [
@@ -121,21 +185,339 @@ def test_extract_urls(mock_pdf_reader, mock_scraper, tmp_path):
         ),
     ],
 )
-def test_verify_extract_titles(mock_get, mock_scraper, rss_content, expected_titles):
+def test_verify_extract_titles(mock_scraper, rss_content, expected_titles):
     """Test title extraction across different RSS feed complexities"""
-    mock_response = Mock()
-    mock_response.status_code = 200
-    mock_response.headers = {"Content-Type": "application/rss+xml"}
-    mock_response.content = rss_content
-    mock_get.return_value = mock_response
+    mock_response = mock_feed_response(rss_content.encode("utf-8"))
+    mock_session = MagicMock()
+    mock_session.head.return_value.__aenter__.return_value = mock_response
+    mock_session.get.return_value.__aenter__.return_value = mock_response
 
-    url, titles = mock_scraper.verify_and_extract_titles("https://example.com/rss")
+    url, titles = asyncio.run(
+        mock_scraper.verify_and_extract_titles(mock_session, "https://example.com/rss")
+    )
+    titles = clean_titles(titles)
 
     assert url == "https://example.com/rss"
     assert titles == expected_titles
     assert len(titles) == len(expected_titles)  # Redundant but explicit
 
 
+@pytest.mark.parametrize(
+    "head_status,head_content_type,expect_get",
+    [
+        # HTML pages are rejected from the HEAD probe alone
+        (200, "text/html; charset=utf-8", False),
+        (404, "application/rss+xml", False),
+        # servers that don't support HEAD fall back to GET
+        (405, "", True),
+    ],
+)
+def test_verify_head_probe(mock_scraper, head_status, head_content_type, expect_get):
+    """Test that the HEAD probe skips the body download for non-feed URLs"""
+    head_response = mock_feed_response(b"", head_status, head_content_type)
+    get_response = mock_feed_response(
+        b"<rss><channel><item><title>Title 1</title></item></channel></rss>"
+    )
+    mock_session = MagicMock()
+    mock_session.head.return_value.__aenter__.return_value = head_response
+    mock_session.get.return_value.__aenter__.return_value = get_response
+
+    _, titles = asyncio.run(
+        mock_scraper.verify_and_extract_titles(mock_session, "https://example.com/rss")
+    )
+
+    assert mock_session.get.called == expect_get
+    assert titles == (["Title 1"] if expect_get else [])
+
+
+def test_verify_stops_reading_early(mock_scraper):
+    """Test that the feed body stops being read once enough titles have been found"""
+    # itunes:title and media:title sit under <item> too, but are not the headline
+    items = "".join(
+        f"<item><itunes:title>Ep {i}</itunes:title><title>Title {i}</title>"
+        f"<media:content><media:title>Photo {i}</media:title></media:content></item>"
+        for i in range(50)
+    )
+    mock_response = mock_feed_response(
+        (
+            '<rss xmlns:itunes="http://www.itunes.com/dtds/podcast-1.0.dtd" '
+            'xmlns:media="http://search.yahoo.com/mrss/">'
+            f"<channel><title>Channel</title>{items}</channel></rss>"
+        ).encode("utf-8")
+    )
+    mock_session = MagicMock()
+    mock_session.head.return_value.__aenter__.return_value = mock_response
+    mock_session.get.return_value.__aenter__.return_value = mock_response
+
+    _, titles = asyncio.run(
+        mock_scraper.verify_and_extract_titles(
+            mock_session, "https://example.com/rss", num_titles=2
+        )
+    )
+
+    assert titles == ["Title 0", "Title 1"]
+    assert mock_response.content.chunks  # rest of the feed was never read
+
+
+@pytest.mark.parametrize(
+    "body,expected_titles",
+    [
+        # undeclared latin-1 bytes are not valid UTF-8 for lxml
+        (
+            b"<rss><channel><item><title>Caf\xe9 news</title></item></channel></rss>",
+            ["Café news"],
+        ),
+        # well-formed, but lxml finds no lowercase item/entry titles
+        (
+            b"<RSS><CHANNEL><ITEM><TITLE>Title 1</TITLE></ITEM></CHANNEL></RSS>",
+            ["Title 1"],
+        ),
+        # entries without a title are skipped rather than raising
+        (
+            b"<RSS><CHANNEL><ITEM><LINK>https://example.com/1</LINK></ITEM>"
+            b"<ITEM><TITLE>Title 2</TITLE></ITEM></CHANNEL></RSS>",
+            ["Title 2"],
+        ),
+    ],
+)
+def test_verify_feedparser_fallback(mock_scraper, body, expected_titles):
+    """Test that feeds lxml cannot handle are still parsed by feedparser"""
+    mock_response = mock_feed_response(body)
+    mock_session = MagicMock()
+    mock_session.head.return_value.__aenter__.return_value = mock_response
+    mock_session.get.return_value.__aenter__.return_value = mock_response
+
+    _, titles = asyncio.run(
+        mock_scraper.verify_and_extract_titles(mock_session, "https://example.com/rss")
+    )
+
+    assert titles == expected_titles
+
+
+def test_verify_not_modified(mock_scraper):
+    """Test that feeds unchanged since the last run reuse their cached titles"""
+    mock_scraper._http_cache["https://example.com/rss"] = {
+        "etag": '"abc"',
+        "last_modified": None,
+        "titles": ["Title 1"],
+    }
+    mock_session = MagicMock()
+    mock_session.get.return_value.__aenter__.return_value = mock_feed_response(
+        b"", status=304
+    )
+
+    _, titles = asyncio.run(
+        mock_scraper.verify_and_extract_titles(mock_session, "https://example.com/rss")
+    )
+
+    assert titles == ["Title 1"]
+    mock_session.head.assert_not_called()
+    assert mock_session.get.call_args.kwargs["headers"] == {"If-None-Match": '"abc"'}
+    assert "https://example.com/rss" in mock_scraper._http_cache
+
+
+def test_verify_caches_validators(mock_scraper):
+    """Test that a feed's ETag is remembered for the next run"""
+    mock_response = mock_feed_response(
+        b"<rss><channel><item><title>Title 1</title></item></channel></rss>"
+    )
+    mock_response.headers["ETag"] = '"abc"'
+    mock_session = MagicMock()
+    mock_session.head.return_value.__aenter__.return_value = mock_response
+    mock_session.get.return_value.__aenter__.return_value = mock_response
+
+    asyncio.run(
+        mock_scraper.verify_and_extract_titles(mock_session, "https://example.com/rss")
+    )
+
+    assert mock_scraper._http_cache["https://example.com/rss"] == {
+        "etag": '"abc"',
+        "last_modified": None,
+        "titles": ["Title 1"],
+    }
+
+
+def test_rss_content_read_only(mock_scraper):
+    """
+    Test that rss_content reflects add_feed and rejects direct assignment.
+    """
+    mock_scraper.add_feed("https://example.com/rss", ["Title 1", "Title 2"])
+
+    assert mock_scraper.rss_content == {"https://example.com/rss": ["Title 1", "Title 2"]}
+    with pytest.raises(TypeError):
+        mock_scraper.rss_content["https://example.com/other"] = ["Title 3"]
+
+
+def test_extract_data(mock_scraper):
+    """
+    Test that extract_data keeps only the URLs that yielded titles.
+    """
+    mock_scraper.urls = ["https://example.com/rss", "https://example.com/page"]
+
+    async def fake_verify(session, url, num_titles=5):
+        return url, ["<b>Title 1</b>", "Title 1"] if url.endswith("rss") else []
+
+    with patch.object(mock_scraper, "verify_and_extract_titles", side_effect=fake_verify):
+        mock_scraper.extract_data(max_connections=2)
+
+    # titles come back cleaned, without the duplicate that only shows up after cleaning
+    assert mock_scraper.rss_content == {"https://example.com/rss": ["Title 1"]}
+
+
+def test_run_data_check(mock_scraper, caplog):
+    """
+    Test that the sanity checks flag short titles and sparse feeds.
+    """
+    mock_scraper.add_feed(
+        "https://example.com/rss", ["A perfectly normal headline", "Short"]
+    )
+    mock_scraper.add_feed("https://example.com/empty", [])
+
+    mock_scraper.run_data_check()
+
+    assert "Title length issue for URL: https://example.com/rss, Title: Short" in caplog.text
+    assert "Less than 3 titles found for URL: https://example.com/rss" in caplog.text
+    assert "Empty titles found for URL: https://example.com/empty" in caplog.text
+
+
+@patch("app.SentenceTransformer")
+def test_topic_modelling_small_corpus(mock_sentence_transformer, mock_scraper, tmp_path):
+    """
+    Test that small corpora are clustered with TF-IDF + KMeans without loading the embedding model.
+    """
+    mock_scraper.add_feed(
+        "https://example.com/business",
+        [
+            "Tariffs hit smartphone prices",
+            "Smartphone tariffs delayed again",
+            "New tariffs on smartphone imports",
+        ],
+    )
+    mock_scraper.add_feed(
+        "https://example.com/sport",
+        [
+            "Golf star wins the Masters",
+            "Masters golf final round recap",
+            "Golf fans flock to the Masters",
+        ],
+    )
+    # the same headline syndicated in a second feed
+    mock_scraper.add_feed(
+        "https://example.com/tech", ["Tariffs hit smartphone prices"]
+    )
+    analysis_file = tmp_path / "topic_analysis.json"
+
+    mock_scraper.topic_modelling(
+        num_topics=2,
+        topic_analysis_file_name=str(analysis_file),
+        topic_bar_chart_file_name=str(tmp_path / "topic_visualization.html"),
+    )
+
+    mock_sentence_transformer.assert_not_called()
+    topics = json.loads(analysis_file.read_text(encoding="utf-8"))
+    assert len(topics) == 2
+    assert sorted(len(topic["titles"]) for topic in topics.values()) == [3, 3]
+    # each topic lists the feeds its titles came from
+    assert sorted(topic["feeds"] for topic in topics.values()) == [
+        ["https://example.com/business", "https://example.com/tech"],
+        ["https://example.com/sport"],
+    ]
+
+
+def test_topic_modelling_no_shared_terms(mock_scraper, tmp_path):
+    """
+    Test that a small corpus where no term repeats still gets clustered.
+    """
+    mock_scraper.add_feed(
+        "https://example.com/rss",
+        [
+            "Tariffs hit smartphone prices",
+            "Golf star wins Masters",
+            "Election results announced tonight",
+        ],
+    )
+    analysis_file = tmp_path / "topic_analysis.json"
+
+    mock_scraper.topic_modelling(
+        num_topics=3, topic_analysis_file_name=str(analysis_file)
+    )
+
+    topics = json.loads(analysis_file.read_text(encoding="utf-8"))
+    assert sorted(len(topic["titles"]) for topic in topics.values()) == [1, 1, 1]
+
+
+def test_topic_modelling_keywords_occur_in_topic(mock_scraper, tmp_path):
+    """
+    Test that keywords only come from terms used by the topic's own titles.
+    """
+    mock_scraper.add_feed(
+        "https://example.com/rss",
+        [
+            "Tariffs hit smartphone prices",
+            "Smartphone tariffs delayed again",
+            "Golf star wins",
+            "Election results tonight",
+            "Heavy rain expected",
+        ],
+    )
+    analysis_file = tmp_path / "topic_analysis.json"
+
+    mock_scraper.topic_modelling(
+        num_topics=2, topic_analysis_file_name=str(analysis_file)
+    )
+
+    topics = json.loads(analysis_file.read_text(encoding="utf-8"))
+    for topic in topics.values():
+        words = " ".join(topic["titles"]).lower()
+        assert all(keyword in words for keyword in topic["keywords"])
+
+
+@patch("app.SentenceTransformer", StubEmbedder)
+def test_bertopic_model_cache(mock_scraper, tmp_path):
+    """
+    Test that a saved topic model is reused to assign titles instead of being refitted.
+    """
+    titles = [
+        f"{word.title()} story number {i}"
+        for word in StubEmbedder.TOPIC_WORDS
+        for i in range(30)
+    ]
+    model_dir = str(tmp_path / "topic_model")
+
+    fitted_topics, _ = mock_scraper._bertopic_topics(titles, 3, model_dir=model_dir)
+    # without an embedding model pointer, loading never builds a second sentence-transformer
+    config = json.loads((tmp_path / "topic_model" / "config.json").read_text())
+    assert "embedding_model" not in config
+
+    with patch.object(
+        app.BERTopic, "fit_transform", side_effect=AssertionError
+    ), patch("sentence_transformers.SentenceTransformer") as hub_model:
+        cached_topics, _ = mock_scraper._bertopic_topics(
+            titles, 3, model_dir=model_dir
+        )
+    hub_model.assert_not_called()
+
+    assert sorted(map(sorted, (t["titles"] for t in cached_topics.values()))) == sorted(
+        map(sorted, (t["titles"] for t in fitted_topics.values()))
+    )
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_save_to_file(mock_scraper, tmp_path, use_orjson):
+    """
+    Test that both JSON writers produce the same UTF-8 output.
+    """
+    mock_scraper.add_feed("https://example.com/rss", ["Economy – Outlook 2025"])
+    filename = tmp_path / "rss_data.json"
+
+    with patch("app.orjson", app.orjson if use_orjson else None):
+        mock_scraper.save_to_file(filename=str(filename))
+
+    assert filename.read_text(encoding="utf-8") == (
+        '{\n  "https://example.com/rss": [\n    "Economy – Outlook 2025"\n  ]\n}'
+    )
+
+
 @pytest.mark.parametrize(
     "raw,expected",
     [
@@ -146,6 +528,8 @@ def test_verify_extract_titles(mock_get, mock_scraper, rss_content, expected_tit
         ("   Multiple    spaces   here   ", "Multiple spaces here"),
         ("<p>Economy â\x80\x93 Outlook 2025</p>", "Economy – Outlook 2025"),
         ("💰 Economic Outlook 2025", "Economic Outlook 2025"),
+        # latin1 round-trip fails because of the emoji, so the sequence replacement kicks in
+        ("💰 Markets â\x80\x94 itâ\x80\x99s a rally", "Markets — it’s a rally"),
         ("", ""),
     ],
 )
@@ -153,3 +537,8 @@ def test_clean_title(raw, expected):
     cleaned = clean_title(raw)
     print(f"Cleaned: {cleaned}")
     assert clean_title(raw) == expected
+
+
+def test_clean_titles():
+    raw = ["<b>Markets</b> rally", "💰 Outlook", "<b>Markets</b> rally"]
+    assert clean_titles(raw) == ["Markets rally", "Outlook", "Markets rally"]
@@ -1,5 +1,23 @@
 import re
 
+# Patterns are compiled once at import time since clean_title runs for every title of every feed
+_TAG_RE = re.compile(r"<[^>]+>")
+_BAD_RE = re.compile(r"[^\w\s'-“”’&!]+")
+_WS_RE = re.compile(r"\s+")
+
+# this is sort of a brute force way of doing it for common encodings found in the files
+# commonly found characters that should be replaced with interpretable alternatives
+_REPLACEMENTS = {
+    "â\x80\x99": "’",
+    "â\x80\x9c": "“",
+    "â\x80\x9d": "”",
+    "â\x80\x93": "–",
+    "â\x80\x94": "—",
+    "â\x80¦": "…",
+}
+# str.translate only maps single characters, so the multi-character sequences are matched in one alternation instead
+_REPLACEMENTS_RE = re.compile("|".join(map(re.escape, _REPLACEMENTS)))
+
 
 def fix_encoding_issues(text):
     """
@@ -29,20 +47,7 @@ def replace_problematic_sequences(text):
     Returns:
         str: The cleaned text with problematic sequences replaced.
     """
-    # this is sort of a brute force way of doing it for common encodings found in the files
-    # commonly found characters that should be replaced with interpretable alternatives
-    replacements = {
-        "â\x80\x99": "’",   
-        "â\x80\x9c": "“",
-        "â\x80\x9d": "”",
-        "â\x80\x93": "–",
-        "â\x80\x94": "—",
-        "â\x80¦": "…",
-    }
-
-    for sequence, replacement in replacements.items():
-        text = text.replace(sequence, replacement)
-    return text
+    return _REPLACEMENTS_RE.sub(lambda match: _REPLACEMENTS[match.group()], text)
 
 
 def remove_html_tags(text):
@@ -55,7 +60,7 @@ def remove_html_tags(text):
     Returns:
         str: The text with HTML tags removed.
     """
-    return re.sub(r"<[^>]+>", "", text)
+    return _TAG_RE.sub("", text)
 
 
 def remove_unwanted_characters(text):
@@ -68,7 +73,7 @@ def remove_unwanted_characters(text):
     Returns:
         str: The cleaned text with unwanted characters removed.
     """
-    return re.sub(r"[^\w\s'-“”’&!]", "", text)
+    return _BAD_RE.sub("", text)
 
 
 def normalize_whitespace(text):
@@ -81,7 +86,7 @@ def normalize_whitespace(text):
     Returns:
         str: The cleaned text with normalized whitespace.
     """
-    return re.sub(r"\s+", " ", text).strip()
+    return _WS_RE.sub(" ", text).strip()
 
 
 def clean_title(title):
@@ -95,10 +100,30 @@ def clean_title(title):
     Returns:
         str: The cleaned title.
     """
-    title = remove_html_tags(title)
-    title = fix_encoding_issues(title)
-    title = replace_problematic_sequences(title)
-    title = remove_unwanted_characters(title)
-    title = normalize_whitespace(title)
+    # inlined rather than calling the helpers above, to save the function call overhead on the hot path
+    title = _TAG_RE.sub("", title)
+    try:
+        title = title.encode("latin1").decode("utf-8")
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        pass
+    title = _REPLACEMENTS_RE.sub(lambda match: _REPLACEMENTS[match.group()], title)
+    title = _BAD_RE.sub("", title)
+
+    return _WS_RE.sub(" ", title).strip()
+
+
+def clean_titles(titles):
+    """
+    Cleans a batch of titles, running the cleaning pipeline only once per distinct raw title.
+
+    The same headline is often syndicated across several feeds of one outlet, so cleaning the whole corpus in one
+    batch skips those repeats.
+
+    Args:
+        titles (list): The raw titles to clean.
 
-    return title
+    Returns:
+        list: The cleaned titles, in the same order as the input.
+    """
+    cleaned = {title: clean_title(title) for title in dict.fromkeys(titles)}
+    return [cleaned[title] for title in titles]